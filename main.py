@@ -1,15 +1,69 @@
 import re
-import jieba
+try:
+    # jieba_fast 用C扩展实现了分词核心，接口和词典与jieba相同
+    import jieba_fast as jieba
+except ImportError:
+    import jieba
 import collections
 import os
+import sys
 import configparser
-from typing import List, Dict, Tuple, Set
+import codecs
+import itertools
+import mmap
+import stat
+import io
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from operator import itemgetter
+from typing import List, Dict, Tuple, Set, Iterator, Iterable
 import argparse
 from wordcloud import WordCloud
 import matplotlib.pyplot as plt
 from datetime import datetime
 
+class _KeepCharTable(dict):
+    """
+    str.translate 使用的字符过滤表
+
+    保留中文、英文、数字、空白和基本标点，其余字符映射为 None（删除）。
+    首次遇到某个字符时计算结果并缓存，之后的查找都在 C 层完成。
+    """
+    _KEEP_PUNCTUATION = frozenset('.,!?，。！？')
+
+    def __missing__(self, codepoint: int):
+        char = chr(codepoint)
+        if (char.isalnum() or char == '_' or char.isspace()
+                or '\u4e00' <= char <= '\u9fff' or char in self._KEEP_PUNCTUATION):
+            value = codepoint
+        else:
+            value = None
+        self[codepoint] = value
+        return value
+
 class ChatFrequencyAnalyzer:
+    # 累计到该字符数后再统一交给 jieba 分词，摊薄每次调用的固定开销
+    TOKENIZE_BATCH_CHARS = 1_000_000
+    # 后台预读：每块字节数，以及队列中最多缓存的块数
+    READ_CHUNK_SIZE = 1 << 20
+    PREFETCH_CHUNKS = 8
+    # 每个进程至少分到的字节数，进程数不超过 文件大小 // 该值，避免进程启动开销得不偿失
+    PARALLEL_MIN_BYTES = 8 << 20
+    # 两次进度输出之间至少间隔的秒数
+    PROGRESS_INTERVAL = 1.0
+    
+    # 特殊标点统计：一整行都是这些标点
+    SPECIAL_PUNCTUATIONS = {
+        '句号': '。',
+        '问号': '？'
+    }
+    # 特殊标点在结果中的显示名称：统计名称 -> 显示名称
+    SPECIAL_DISPLAY_NAME_MAP = {name: f"[整行都是{name}]" for name in SPECIAL_PUNCTUATIONS}
+    SPECIAL_DISPLAY_NAMES = frozenset(SPECIAL_DISPLAY_NAME_MAP.values())
+    
     def __init__(self, config_file: str = "config.ini"):
         """
         初始化高频词分析器
@@ -20,8 +74,16 @@ class ChatFrequencyAnalyzer:
         self.config = self.load_config(config_file)
         self.min_frequency = self.config.getint('settings', 'min_frequency')
         self.enable_punctuation_stats = self.config.getboolean('settings', 'enable_punctuation_stats')
+        self.enable_hmm = self.config.getboolean('settings', 'enable_hmm', fallback=True)
+        self.num_workers = self.config.getint('settings', 'num_workers', fallback=0)
         self.stopwords = self.load_stopwords()
         
+        # 预编译预处理用到的正则表达式，避免每行重复查找模式缓存
+        self._re_url = re.compile(r'https?://\S+')
+        self._re_email = re.compile(r'\S+@\S+')
+        self._keep_table = _KeepCharTable()
+        self._re_ws = re.compile(r'\s+')
+        
     def load_config(self, config_file: str) -> configparser.ConfigParser:
         """
         加载配置文件
@@ -45,7 +107,9 @@ class ChatFrequencyAnalyzer:
                 'wordcloud_background_color': 'white',
                 'font_path': 'C:/Windows/Fonts/simhei.ttf',
                 'show_wordcloud': 'true',
-                'save_wordcloud': 'true'
+                'save_wordcloud': 'true',
+                'enable_hmm': 'true',
+                'num_workers': '0'
             }
         }
         
@@ -70,7 +134,7 @@ class ChatFrequencyAnalyzer:
         
         return config
         
-    def load_stopwords(self) -> set:
+    def load_stopwords(self) -> frozenset:
         """
         加载排除词列表
         
@@ -128,13 +192,27 @@ class ChatFrequencyAnalyzer:
                     words = [line.strip() for line in f if line.strip() and not line.startswith('#')]
                     user_stopwords = set(words)
                     print(f"从 stopwords.txt 加载了 {len(user_stopwords)} 个排除词")
-                    # 合并默认排除词和用户自定义排除词
-                    return default_stopwords.union(user_stopwords)
+                    # 合并默认排除词和用户自定义排除词（原地合并，不生成中间集合）
+                    default_stopwords.update(user_stopwords)
+                    return self.freeze_stopwords(default_stopwords)
             except Exception as e:
                 print(f"读取 stopwords.txt 失败，使用内置排除词: {e}")
         
         print(f"使用内置排除词，共 {len(default_stopwords)} 个词")
-        return default_stopwords
+        return self.freeze_stopwords(default_stopwords)
+    
+    @staticmethod
+    def freeze_stopwords(words: Set[str]) -> frozenset:
+        """
+        驻留排除词字符串并转为不可变集合，加快统计时的成员判断
+        
+        Args:
+            words: 排除词集合
+            
+        Returns:
+            排除词 frozenset
+        """
+        return frozenset(sys.intern(word) for word in words)
     
     def preprocess_text(self, text: str) -> str:
         """
@@ -146,17 +224,21 @@ class ChatFrequencyAnalyzer:
         Returns:
             处理后的文本
         """
-        # 移除URL
-        text = re.sub(r'https?://\S+', '', text)
+        # 移除URL（绝大多数聊天行不含链接，先做子串判断跳过正则）
+        if '://' in text:
+            text = self._re_url.sub('', text)
         # 移除邮箱
-        text = re.sub(r'\S+@\S+', '', text)
+        if '@' in text:
+            text = self._re_email.sub('', text)
         # 移除特殊字符，但保留中文、英文、数字和基本标点
-        text = re.sub(r'[^\w\u4e00-\u9fff\s\.\,\!\?，。！？]', '', text)
+        text = text.translate(self._keep_table)
         # 合并多个空格
-        text = re.sub(r'\s+', ' ', text)
+        # 除 ASCII 空格外的空白字符都不可打印，若没有这些字符也没有连续空格则无需合并
+        if not text.isprintable() or '  ' in text:
+            text = self._re_ws.sub(' ', text)
         return text.strip()
     
-    def extract_words(self, text: str) -> List[str]:
+    def extract_words(self, text: str) -> Iterator[str]:
         """
         从文本中提取词汇
         
@@ -164,121 +246,381 @@ class ChatFrequencyAnalyzer:
             text: 文本内容
             
         Returns:
-            词汇列表
+            词汇迭代器
+        """
+        # 使用jieba进行分词，并过滤空字符串、纯空格和排除词
+        # jieba 会把空白单独切成一个词，其余词两端不含空白，无需再 strip
+        stopwords = self.stopwords
+        return (word for word in jieba.cut(text, HMM=self.enable_hmm)
+                if word and not word.isspace() and word not in stopwords)
+    
+    def count_batch(self, lines: collections.Counter, word_freq: collections.Counter) -> None:
         """
-        # 使用jieba进行分词
-        words = jieba.lcut(text)
+        对一批预处理后的行统一分词并统计频率
         
-        # 过滤空字符串和纯空格
-        words = [word.strip() for word in words if word.strip()]
+        连续的只出现一次的行以换行符拼接后只调用一次jieba，换行符会作为分隔，不会跨行成词；
+        重复出现的行（如"哈哈"、"好的"）只分词一次，再按出现次数累加。
+        按行首次出现的顺序统计，保证词汇的首次出现顺序（同频率时的排序）与逐行统计一致
         
-        return words
-    
-    def analyze_chat_file(self, file_path: str) -> Tuple[Dict[str, int], Dict[str, int]]:
+        Args:
+            lines: 预处理后的文本行及其出现次数
+            word_freq: 词汇频率计数器（原地更新）
         """
-        分析聊天记录文件
+        # 尚未分词的连续单次行
+        run = []
+        for line, count in lines.items():
+            if count == 1:
+                run.append(line)
+                continue
+            
+            # 先统计排在前面的单次行，再统计重复行
+            if run:
+                word_freq.update(self.extract_words('\n'.join(run)))
+                run = []
+            for word in self.extract_words(line):
+                word_freq[word] += count
+        
+        # 提取词汇并统计频率
+        if run:
+            word_freq.update(self.extract_words('\n'.join(run)))
+    
+    def read_lines(self, file_path: str, start: int = 0, end: int = None) -> Iterator[str]:
+        """
+        逐行读取文件（或其中一段字节范围），由后台线程预读
+        
+        普通文件只把需要的字节范围以只读方式映射到内存，读线程按块解码放入有界队列，
+        主线程同时进行分词统计。解码时触发的缺页发生在持有GIL的C代码中，因此读线程
+        在解码当前块之前先用 MADV_WILLNEED 让内核异步预读下一块，使磁盘I/O与分词重叠。
+        管道等非普通文件或无法映射的文件改用普通读取
         
         Args:
-            file_path: 聊天记录文件路径
+            file_path: 文件路径
+            start: 起始字节偏移，需位于行首
+            end: 结束字节偏移（不含），None 表示读到文件末尾
+            
+        Returns:
+            文本行迭代器（不含换行符）
+        """
+        chunks = queue.Queue(maxsize=self.PREFETCH_CHUNKS)
+        stop = threading.Event()
+        
+        with open(file_path, 'rb') as f:
+            mm = None
+            # 只有普通文件才能按大小划分范围和映射；管道等（如 <(cat chat.txt)）大小为0，只能顺序读到结束
+            file_stat = os.fstat(f.fileno())
+            if stat.S_ISREG(file_stat.st_mode):
+                if end is None:
+                    end = file_stat.st_size
+                if end > start:
+                    # 映射起点需对齐到分配粒度，pos 与 limit 都是相对映射起点的偏移
+                    offset = start - start % mmap.ALLOCATIONGRANULARITY
+                    limit = end - offset
+                    try:
+                        mm = mmap.mmap(f.fileno(), limit, access=mmap.ACCESS_READ, offset=offset)
+                    except (OSError, ValueError, OverflowError):
+                        # 无法映射（如32位Python上超过地址空间的大文件），改用普通读取
+                        mm = None
+                    if mm is not None and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                        # 提示内核按顺序读取，加大预读
+                        mm.madvise(mmap.MADV_SEQUENTIAL)
+            will_need = hasattr(mmap, 'MADV_WILLNEED')
+            
+            def blocks():
+                """按块产出原始字节"""
+                if mm is not None:
+                    pos = start - offset
+                    while pos < limit:
+                        next_pos = min(pos + self.READ_CHUNK_SIZE, limit)
+                        if will_need and next_pos < limit:
+                            # 让内核异步预读下一块（起点需按页对齐），避免解码时在持有GIL的情况下等待读盘
+                            advise_start = next_pos - next_pos % mmap.PAGESIZE
+                            advise_end = min(next_pos + self.READ_CHUNK_SIZE, limit)
+                            mm.madvise(mmap.MADV_WILLNEED, advise_start, advise_end - advise_start)
+                        # 切片本身不复制，但 UTF-8 增量解码器会先把它拼接成新的 bytes 再解码，
+                        # 因此并非零拷贝；映射的作用在于配合 madvise 控制内核预读
+                        with memoryview(mm) as view, view[pos:next_pos] as data:
+                            yield data
+                        pos = next_pos
+                else:
+                    # 普通读取：非普通文件读到结束，无法映射的普通文件读到 end
+                    if end is not None:
+                        f.seek(start)
+                    left = None if end is None else end - start
+                    while left is None or left > 0:
+                        data = f.read(self.READ_CHUNK_SIZE if left is None else min(self.READ_CHUNK_SIZE, left))
+                        if not data:
+                            return
+                        if left is not None:
+                            left -= len(data)
+                        yield data
+            
+            def reader():
+                source = blocks()
+                try:
+                    # 与文本模式打开相同：UTF-8 解码并统一换行符
+                    decoder = io.IncrementalNewlineDecoder(
+                        codecs.getincrementaldecoder('utf-8')(), translate=True)
+                    for data in source:
+                        if stop.is_set():
+                            return
+                        chunk = decoder.decode(data)
+                        if chunk:
+                            chunks.put(chunk)
+                    chunk = decoder.decode(b'', final=True)
+                    if chunk:
+                        chunks.put(chunk)
+                    # 空字符串表示读到范围末尾
+                    chunks.put('')
+                except Exception as e:
+                    # 交给主线程抛出（例如 UnicodeDecodeError）
+                    chunks.put(e)
+                finally:
+                    # 释放映射区的切片，之后才能关闭映射
+                    source.close()
+            
+            thread = threading.Thread(target=reader, daemon=True)
+            thread.start()
+            try:
+                pending = ''
+                while True:
+                    chunk = chunks.get()
+                    if isinstance(chunk, Exception):
+                        raise chunk
+                    if not chunk:
+                        break
+                    # 最后一段可能是不完整的行，留到下一块拼接
+                    lines = (pending + chunk).split('\n')
+                    pending = lines.pop()
+                    yield from lines
+                if pending:
+                    yield pending
+            finally:
+                # 提前结束时通知读线程退出，并取走队列中的块以免其阻塞在 put 上
+                stop.set()
+                while thread.is_alive():
+                    try:
+                        chunks.get(timeout=0.1)
+                    except queue.Empty:
+                        pass
+                if mm is not None:
+                    mm.close()
+    
+    def split_file(self, file_path: str, size: int, parts: int) -> List[Tuple[int, int]]:
+        """
+        把文件按字节切分为若干段，每段边界都对齐到换行符之后
+        
+        Args:
+            file_path: 文件路径
+            size: 文件大小（字节）
+            parts: 期望的段数
+            
+        Returns:
+            [(起始偏移, 结束偏移), ...]，可能少于 parts 段
+        """
+        boundaries = [0]
+        with open(file_path, 'rb') as f:
+            for i in range(1, parts):
+                offset = max(size * i // parts, boundaries[-1])
+                if offset >= size:
+                    break
+                f.seek(offset)
+                # 跳到下一行的行首
+                f.readline()
+                offset = f.tell()
+                if offset >= size:
+                    break
+                if offset > boundaries[-1]:
+                    boundaries.append(offset)
+        boundaries.append(size)
+        return list(zip(boundaries[:-1], boundaries[1:]))
+    
+    def count_lines(self, lines: Iterable[str], show_progress: bool = False) -> Tuple[collections.Counter, Dict[str, int], int]:
+        """
+        对文本行执行纯标点统计、预处理、分词和词频统计
+        
+        Args:
+            lines: 文本行
+            show_progress: 是否显示处理进度
             
         Returns:
-            (词汇频率字典, 特殊标点统计字典)
+            (词汇频率计数器, 特殊标点统计字典, 读取的行数)
         """
         word_freq = collections.Counter()
-        total_lines = 0
+        line_num = 0
         
         # 特殊标点统计：一整行都是这些标点
-        special_punctuations = {
-            '句号': '。',
-            '问号': '？'
-        }
-        special_counts = {name: 0 for name in special_punctuations}
+        special_counts = {name: 0 for name in self.SPECIAL_PUNCTUATIONS}
+        
+        # 待分词的预处理行缓冲（行 -> 出现次数），batch_chars 只计不重复的行
+        batch = collections.Counter()
+        batch_chars = 0
+        
+        # 循环内频繁使用的属性先取到局部变量，减少每行的属性查找
+        preprocess_text = self.preprocess_text
+        check_punctuation = self.enable_punctuation_stats
+        batch_limit = self.TOKENIZE_BATCH_CHARS
+        
+        last_progress = time.monotonic()
+        for line_num, line in enumerate(lines, 1):
+            # 显示进度：每 1024 行检查一次时间，避免频繁输出拖慢终端
+            if show_progress and not line_num & 0x3FF:
+                now = time.monotonic()
+                if now - last_progress >= self.PROGRESS_INTERVAL:
+                    print(f"已处理 {line_num} 行...")
+                    last_progress = now
+            
+            # 检查整行是否都是特殊标点
+            stripped_line = line.strip()
+            
+            # 如果开启纯标点统计
+            if check_punctuation and stripped_line:
+                # 检查是否整行都是句号（可能有多个），strip 后为空即全部是该字符
+                if not stripped_line.strip('。'):
+                    special_counts['句号'] += 1
+                    continue
+                
+                # 检查是否整行都是问号（可能有多个）
+                if not stripped_line.strip('？'):
+                    special_counts['问号'] += 1
+                    continue
+            
+            # 预处理文本
+            processed_line = preprocess_text(line)
+            if not processed_line:
+                continue
+            
+            # 加入缓冲，攒够一批再分词
+            if processed_line in batch:
+                batch[processed_line] += 1
+                continue
+            batch[processed_line] = 1
+            batch_chars += len(processed_line)
+            if batch_chars >= batch_limit:
+                self.count_batch(batch, word_freq)
+                batch = collections.Counter()
+                batch_chars = 0
+        
+        # 处理剩余的缓冲行
+        if batch:
+            self.count_batch(batch, word_freq)
+        
+        return word_freq, special_counts, line_num
+    
+    def count_ranges(self, file_path: str, ranges: List[Tuple[int, int]]) -> Tuple[collections.Counter, Dict[str, int], int]:
+        """
+        用多个子进程分别分析文件的各段字节范围，并按顺序合并结果
+        
+        Args:
+            file_path: 文件路径
+            ranges: split_file 返回的字节范围列表
+            
+        Returns:
+            (词汇频率计数器, 特殊标点统计字典, 读取的行数)
+        """
+        print(f"使用 {len(ranges)} 个进程并行分析...")
+        word_freq = collections.Counter()
+        special_counts = {name: 0 for name in self.SPECIAL_PUNCTUATIONS}
+        total_lines = 0
+        
+        with ProcessPoolExecutor(max_workers=len(ranges), initializer=_init_worker,
+                                 initargs=(self,)) as executor:
+            futures = [executor.submit(_count_range, file_path, start, end)
+                       for start, end in ranges]
+            # 按提交顺序合并，保证结果与单进程一致
+            for i, future in enumerate(futures, 1):
+                part_freq, part_counts, part_lines = future.result()
+                word_freq.update(part_freq)
+                for name, count in part_counts.items():
+                    special_counts[name] += count
+                total_lines += part_lines
+                print(f"已完成 {i}/{len(ranges)} 段...")
+        
+        return word_freq, special_counts, total_lines
+    
+    def analyze_chat_file(self, file_path: str) -> Tuple[collections.Counter, Dict[str, int]]:
+        """
+        分析聊天记录文件
+        
+        文件较大且允许多进程时，按行切分为多段交给子进程并行分析，再合并结果
         
+        Args:
+            file_path: 聊天记录文件路径
+            
+        Returns:
+            (词汇频率计数器, 特殊标点统计字典)
+        """
         print(f"开始分析文件: {file_path}")
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f, 1):
-                    # 显示进度
-                    if line_num % 1000 == 0:
-                        print(f"已处理 {line_num} 行...")
-                    
-                    # 检查整行是否都是特殊标点
-                    stripped_line = line.strip()
-                    
-                    # 如果开启纯标点统计
-                    if self.enable_punctuation_stats:
-                        # 检查是否整行都是句号
-                        if stripped_line == '。':
-                            special_counts['句号'] += 1
-                            continue
-                        
-                        # 检查是否整行都是问号
-                        if stripped_line == '？':
-                            special_counts['问号'] += 1
-                            continue
-                        
-                        # 检查是否整行都是句号（可能有多个）
-                        if all(char == '。' for char in stripped_line) and len(stripped_line) > 0:
-                            special_counts['句号'] += 1
-                            continue
-                        
-                        # 检查是否整行都是问号（可能有多个）
-                        if all(char == '？' for char in stripped_line) and len(stripped_line) > 0:
-                            special_counts['问号'] += 1
-                            continue
-                    
-                    # 预处理文本
-                    processed_line = self.preprocess_text(line)
-                    if not processed_line:
-                        continue
-                    
-                    # 提取词汇
-                    words = self.extract_words(processed_line)
-                    
-                    # 统计频率
-                    for word in words:
-                        word_freq[word] += 1
-                    
-                    total_lines = line_num
-                    
+            workers = self.num_workers or os.cpu_count() or 1
+            if sys.platform == 'win32':
+                # Windows 上 ProcessPoolExecutor 最多支持 61 个进程，超过会抛出 ValueError
+                workers = min(workers, 61)
+            file_stat = os.stat(file_path)
+            # 只有普通文件能按字节范围切分，管道等非普通文件始终单进程顺序读取
+            if stat.S_ISREG(file_stat.st_mode):
+                # 按文件大小限制进程数，保证每个进程至少分到 PARALLEL_MIN_BYTES 字节
+                workers = min(workers, file_stat.st_size // self.PARALLEL_MIN_BYTES)
+            else:
+                workers = 1
+            if workers > 1:
+                ranges = self.split_file(file_path, file_stat.st_size, workers)
+            else:
+                ranges = []
+            
+            # jieba 分词全程持有GIL，多线程无法并行分词，因此并行使用多进程；
+            # 单进程时由 read_lines 的读线程让文件读取与分词重叠
+            result = None
+            if len(ranges) > 1:
+                try:
+                    result = self.count_ranges(file_path, ranges)
+                except BrokenProcessPool:
+                    # 子进程被系统终止（如内存不足）或启动失败
+                    print("警告: 子进程异常退出，改用单进程分析")
+            if result is None:
+                result = self.count_lines(self.read_lines(file_path), show_progress=True)
+            word_freq, special_counts, total_lines = result
+                
             print(f"文件分析完成，共处理 {total_lines} 行")
-            return dict(word_freq), special_counts
+            return word_freq, special_counts
             
         except FileNotFoundError:
             print(f"错误: 文件 {file_path} 不存在")
-            return {}, {}
+            return collections.Counter(), {}
         except UnicodeDecodeError:
             print("错误: 文件编码不是UTF-8，请确保文件使用UTF-8编码")
-            return {}, {}
+            return collections.Counter(), {}
     
-    def filter_and_sort(self, word_freq: Dict[str, int], special_counts: Dict[str, int]) -> List[Tuple[str, int]]:
+    def filter_and_sort(self, word_freq: collections.Counter, special_counts: Dict[str, int]) -> List[Tuple[str, int]]:
         """
         过滤和排序结果，包括特殊标点
         
         Args:
-            word_freq: 词汇频率字典
+            word_freq: 词汇频率计数器
             special_counts: 特殊标点统计字典
             
         Returns:
             排序后的词汇频率列表
         """
-        # 过滤排除词和低于阈值的词
-        filtered_freq = {
+        # 过滤低于阈值的词（排除词已在统计时过滤），并按频率降序排序
+        filtered_freq = collections.Counter({
             word: freq for word, freq in word_freq.items() 
-            if (word not in self.stopwords) and (freq >= self.min_frequency)
-        }
+            if freq >= self.min_frequency
+        })
+        sorted_freq = filtered_freq.most_common()
         
         # 添加特殊标点到结果中（如果达到阈值且开启统计）
         if self.enable_punctuation_stats:
-            for name, count in special_counts.items():
-                if count >= self.min_frequency:
-                    # 使用有意义的名称代替标点符号本身
-                    display_name = f"[整行都是{name}]"
-                    filtered_freq[display_name] = count
-        
-        # 按频率降序排序
-        sorted_freq = sorted(filtered_freq.items(), key=lambda x: x[1], reverse=True)
+            special_items = [
+                # 使用有意义的名称代替标点符号本身
+                (self.SPECIAL_DISPLAY_NAME_MAP[name], count)
+                for name, count in special_counts.items()
+                if count >= self.min_frequency
+            ]
+            if special_items:
+                sorted_freq.extend(special_items)
+                # 稳定排序，同频率时特殊标点仍排在词汇之后
+                sorted_freq.sort(key=itemgetter(1), reverse=True)
         
         return sorted_freq
     
@@ -309,7 +651,7 @@ class ChatFrequencyAnalyzer:
                 f.write("-" * 40 + "\n")
                 for name, count in special_counts.items():
                     if count >= self.min_frequency:
-                        f.write(f"[整行都是{name}]: {count:>6}\n")
+                        f.write(f"{self.SPECIAL_DISPLAY_NAME_MAP[name]}: {count:>6}\n")
                 f.write("\n")
             
             # 显示高频词
@@ -317,7 +659,7 @@ class ChatFrequencyAnalyzer:
             f.write("-" * 40 + "\n")
             for word, freq in sorted_freq:
                 # 跳过特殊标点（已经在上面显示过了）
-                if not word.startswith('[整行都是'):
+                if word not in self.SPECIAL_DISPLAY_NAMES:
                     f.write(f"{word:<15} {freq:>6}\n")
         
         print(f"详细结果已保存到: {detailed_file}")
@@ -326,7 +668,7 @@ class ChatFrequencyAnalyzer:
         with open(vocab_file, 'w', encoding='utf-8') as f:
             for word, _ in sorted_freq:
                 # 跳过特殊标记
-                if not word.startswith('[整行都是'):
+                if word not in self.SPECIAL_DISPLAY_NAMES:
                     f.write(f"{word}\n")
         
         print(f"纯词汇列表已保存到: {vocab_file}")
@@ -349,13 +691,10 @@ class ChatFrequencyAnalyzer:
                     f.write(f"整行都是{name}: {count}次\n")
                 f.write("\n")
             
-            # 统计不同长度词汇的分布
-            length_dist = {}
-            for word, freq in sorted_freq:
-                # 跳过特殊标记
-                if not word.startswith('[整行都是'):
-                    length = len(word)
-                    length_dist[length] = length_dist.get(length, 0) + 1
+            # 统计不同长度词汇的分布（跳过特殊标记）
+            length_dist = collections.Counter(
+                len(word) for word, _ in sorted_freq if word not in self.SPECIAL_DISPLAY_NAMES
+            )
             
             f.write("词汇长度分布:\n")
             for length in sorted(length_dist.keys()):
@@ -377,19 +716,20 @@ class ChatFrequencyAnalyzer:
             词云图片文件路径
         """
         try:
+            # 获取词云配置
+            max_words = self.config.getint('settings', 'wordcloud_max_words')
+            
             # 准备词频数据，排除特殊标点标记
-            word_freq = {}
-            for word, freq in sorted_freq:
-                # 跳过特殊标点标记
-                if not word.startswith('[整行都是'):
-                    word_freq[word] = freq
+            # sorted_freq 已按频率降序排列，词云最多只显示 max_words 个词，只取前 max_words 个即可
+            word_freq = dict(itertools.islice(
+                ((word, freq) for word, freq in sorted_freq if word not in self.SPECIAL_DISPLAY_NAMES),
+                max_words
+            ))
             
             if not word_freq:
                 print("没有足够的数据生成词云")
                 return None
             
-            # 获取词云配置
-            max_words = self.config.getint('settings', 'wordcloud_max_words')
             width = self.config.getint('settings', 'wordcloud_width')
             height = self.config.getint('settings', 'wordcloud_height')
             bg_color = self.config.get('settings', 'wordcloud_background_color')
@@ -438,6 +778,19 @@ class ChatFrequencyAnalyzer:
             traceback.print_exc()
             return None
 
+# 子进程中使用的分析器，由 _init_worker 设置
+_worker_analyzer = None
+
+def _init_worker(analyzer: ChatFrequencyAnalyzer):
+    """子进程初始化：保存分析器并初始化jieba"""
+    global _worker_analyzer
+    _worker_analyzer = analyzer
+    jieba.initialize()
+
+def _count_range(file_path: str, start: int, end: int) -> Tuple[collections.Counter, Dict[str, int], int]:
+    """在子进程中分析文件的一段字节范围"""
+    return _worker_analyzer.count_lines(_worker_analyzer.read_lines(file_path, start, end))
+
 def create_exclude_list():
     """创建排除词列表文件模板"""
     exclude_file = "stopwords.txt"
@@ -508,7 +861,9 @@ def create_default_config():
         'wordcloud_background_color': 'white',
         'font_path': 'C:/Windows/Fonts/simhei.ttf',
         'show_wordcloud': 'true',
-        'save_wordcloud': 'true'
+        'save_wordcloud': 'true',
+        'enable_hmm': 'true',
+        'num_workers': '0'
     }
     
     with open(config_file, 'w', encoding='utf-8') as f:
@@ -585,9 +940,11 @@ def main():
     print(f"\n前20个高频项 (出现次数 ≥ {analyzer.min_frequency}):")
     print("-" * 40)
     
-    # 分离特殊标点和高频词以便分别显示
-    special_items = [(word, freq) for word, freq in sorted_freq if word.startswith('[整行都是')]
-    word_items = [(word, freq) for word, freq in sorted_freq if not word.startswith('[整行都是')]
+    # 分离特殊标点和高频词以便分别显示（单次遍历）
+    special_items, word_items = [], []
+    special_names = analyzer.SPECIAL_DISPLAY_NAMES
+    for item in sorted_freq:
+        (special_items if item[0] in special_names else word_items).append(item)
     
     # 显示特殊标点
     if special_items:
@@ -640,7 +997,6 @@ if __name__ == "__main__":
     print("  创建配置文件模板: python main.py --create-config")
     
     # 如果没有命令行参数，显示使用说明
-    import sys
     if len(sys.argv) == 1:
         print("\n请提供聊天记录文件路径作为参数")
         print("或使用 --help 查看完整帮助信息")